@@ -27,7 +27,8 @@ def server(address: str, port: int) -> None:
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
 
     sock.bind((address, port))
-    print(f"Listening on {sock.getsockname()!r}")
+    local_address = sock.getsockname()
+    print(f"Listening on {local_address!r}")
     while True:
         data, address = sock.recvfrom(MAX_BYTES)
         print(f"Client {address!r} sent {data!r}")
@@ -21,10 +21,15 @@ I've implemented both approaches in the echo server as `careful_client()` and
 for the final program.
 """
 import argparse
+import atexit
 import logging
+import select
 import socket
 import sys
 
+from recvmmsg import BatchReceiver
+from socket_buffers import set_buffer_sizes
+
 
 logger = logging.getLogger(__name__)
 LOOPBACK = "127.0.0.1"
@@ -32,6 +37,16 @@ DEFAULT_PORT = 6060
 MAX_BYTES = 65535
 ROLES = ('client', 'server')
 
+# Client sockets are kept open between messages, keyed by server address
+_CLIENT_SOCKETS: dict[tuple[str, int], socket.socket] = {}
+_PROMISCUOUS_SOCKETS: dict[tuple[str, int], socket.socket] = {}
+
+
+@atexit.register
+def _close_client_sockets() -> None:
+    for sock in (*_CLIENT_SOCKETS.values(), *_PROMISCUOUS_SOCKETS.values()):
+        sock.close()
+
 
 def server(host: str, port: int) -> None:
     """
@@ -48,18 +63,29 @@ def server(host: str, port: int) -> None:
     """
     # Create socket: UDP on a IP network
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    set_buffer_sizes(sock)
     address = (host, port)
 
     # Request address from OS, ie. (hostname, port)
+    # Local address never changes once bound, so only ask for it once
     sock.bind(address)
-    logger.info("UDP echo server listening on %r", sock.getsockname())
-
-    # Listen, forever
+    local_address = sock.getsockname()
+    logger.info("UDP echo server listening on %r", local_address)
+
+    # Listen, forever. Wait for activity then read every queued datagram.
+    # Echo first, so that reply is not held up while we format log messages.
+    # Data is echoed straight out of the receive buffer, without copying.
+    # Slots are big enough for any datagram, so nothing is ever truncated.
+    receiver = BatchReceiver(size=MAX_BYTES)
     while True:
-        data, address = sock.recvfrom(MAX_BYTES)
-        logger.info(f"{address!r} sent {len(data):,} bytes:")
-        logger.debug(data)
-        sock.sendto(data, address)
+        select.select([sock], [], [])
+        for data, address in receiver.receive(sock, copy=False):
+            sock.sendto(data, address)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "%r sent %s bytes to %r:", address, len(data), local_address,
+                )
+                logger.debug("%r", bytes(data))
 
 
 def client(host: str, port: int) -> None:
@@ -69,13 +95,30 @@ def client(host: str, port: int) -> None:
     String from user is encoded into UTF-8 before hitting network, then
     decoded back into a string.
 
+    If standard input is not a terminal, eg. piped from a script, every
+    line is sent without prompting, then the replies are collected.
+
     Args:
         As per `server`.
     """
+    # There is no gain in asking for ASCII instead: CPython already copies
+    # pure-ASCII strings straight out when encoding to UTF-8
+    if not sys.stdin.isatty():
+        messages = [
+            line.rstrip("\n").encode("utf-8", errors="replace")
+            for line in sys.stdin
+        ]
+        for received in pipelined_client(host, port, messages):
+            print(received.decode("utf-8", errors="replace"))
+        return
+
+    # Enables line editing and history for `input()`
+    import readline                                             # noqa: F401
+
     while True:
         text = input("> ")
         message = text.encode("utf-8", errors="replace")
-        received = careful_client(host, options.port, message)
+        received = careful_client(host, port, message)
         print(received.decode("utf-8", errors="replace"))
 
 
@@ -86,7 +129,7 @@ def careful_client(
     timeout: float = 5,
 ) -> bytes:
     """
-    Create new socket and send single outgoing UDP message.
+    Send single outgoing UDP message, reusing socket for same server.
 
     Solves promiscuous UDP client problem by using `socket.connect()` to force
     OS to check sender address and reject packets not sent by destination
@@ -115,13 +158,7 @@ def careful_client(
     Returns:
         Byte string send back from server.
     """
-    # Create socket
-    # Note that port is assigned during call to connect, not on first message
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    address = (host, port)
-    sock.connect(address)
-    sock.settimeout(timeout)
-    logger.info("UDP address assigned by OS: %r", sock.getsockname())
+    sock = _connected_socket(host, port, timeout)
 
     # Send message to server, address not necessary
     sock.send(message)
@@ -132,9 +169,56 @@ def careful_client(
     return data
 
 
+def pipelined_client(
+    host: str,
+    port: int,
+    messages: list[bytes],
+    timeout: float = 5,
+) -> list[bytes]:
+    """
+    Send every message to server before waiting for any of the replies.
+
+    Uses the same connected socket as `careful_client()`.
+
+    Args:
+        As per `careful_client()`, but with a list of messages.
+
+    Raises:
+        TimeoutError:
+            If any reply does not arrive within `timeout` seconds.
+
+    Returns:
+        Byte strings sent back from server, in order of arrival.
+    """
+    sock = _connected_socket(host, port, timeout)
+    for message in messages:
+        sock.send(message)
+    return [sock.recv(MAX_BYTES) for _ in messages]
+
+
+def _connected_socket(host: str, port: int, timeout: float) -> socket.socket:
+    """
+    Fetch connected socket for server, creating it on first use.
+    """
+    # Note that port is assigned during call to connect, not on first message
+    address = (host, port)
+    sock = _CLIENT_SOCKETS.get(address)
+    if sock is None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        set_buffer_sizes(sock)
+        sock.connect(address)
+        local_address = sock.getsockname()
+        logger.info("UDP address assigned by OS: %r", local_address)
+        _CLIENT_SOCKETS[address] = sock
+
+    if sock.gettimeout() != timeout:
+        sock.settimeout(timeout)
+    return sock
+
+
 def promiscuous_client(host: str, port: int, message: bytes) -> bytes:
     """
-    Create new socket and send single outgoing UDP message.
+    Send single outgoing UDP message, reusing socket for same server.
 
     Note that client will NOT raise a `ConnectionRefusedError` if client not
     running.
@@ -154,15 +238,22 @@ def promiscuous_client(host: str, port: int, message: bytes) -> bytes:
     Returns:
         Byte string send back from server.
     """
-    # Create socket
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.settimeout(1)
+    # Create socket on first use only
     address = (host, port)
+    sock = _PROMISCUOUS_SOCKETS.get(address)
+    created = sock is None
+    if created:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        set_buffer_sizes(sock)
+        sock.settimeout(1)
+        _PROMISCUOUS_SOCKETS[address] = sock
 
     # Send message to server
     # Note that port is not assigned by OS until AFTER message is sent
     sock.sendto(message, address)
-    logger.info("UDP address assigned by OS: %r", sock.getsockname())
+    if created:
+        local_address = sock.getsockname()
+        logger.info("UDP address assigned by OS: %r", local_address)
 
     # Recieved data back from server
     data, address = sock.recvfrom(MAX_BYTES)    # Warning! Promiscuous client!
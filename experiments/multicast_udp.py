@@ -6,11 +6,18 @@ Experiment with using UDP multicast to enumerate DUT simulators.
 from collections import namedtuple
 import logging
 from pprint import pprint as pp
+import select
 import socket
 import sys
+import time
 
+from recvmmsg import BatchReceiver
+from socket_buffers import set_buffer_sizes
 
+
+logger = logging.getLogger(__name__)
 HOSTNAME = "0.0.0.0"
+DISCOVERY_MESSAGE = b"ID;"
 MAX_BYTES = 65535
 MULTICAST_IP = "224.3.11.15"
 MULTICAST_PORT = 31115
@@ -25,6 +32,8 @@ def multicast_client(
     port: int,
     message: bytes,
     timeout: float = 1.0,
+    interface: str | None = None,
+    loopback: bool = True,
 ) -> list[Datagram]:
     """
     Send message to multicast group's subscribers.
@@ -38,26 +47,44 @@ def multicast_client(
             Byte string to send to multicast listeners.
         timeout:
             Seconds to wait for discovery messages to come back
+        interface:
+            IP address of local interface to send from, eg. "192.168.0.2"
+        loopback:
+            Also deliver message to listeners on this host.
 
     Returns:
         None
     """
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    # Create non-blocking socket in one step where possible (Linux)
+    flags = getattr(socket, 'SOCK_NONBLOCK', 0)
+    sock = socket.socket(
+        socket.AF_INET, socket.SOCK_DGRAM | flags, socket.IPPROTO_UDP,
+    )
+    if not flags:
+        sock.setblocking(False)
+    set_buffer_sizes(sock)
     sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, MULTICAST_TTL)
-    sock.settimeout(timeout)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, int(loopback))
+    if interface is not None:
+        ip = socket.inet_aton(interface)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, ip)
 
-    address = (MULTICAST_IP, MULTICAST_PORT)
+    address = (address, port)
     sock.sendto(message, address)
     logging.debug(f"send {message} to {address!r}")
 
-    # Block for `timeout` seconds to collect multicast responses
+    # Wait no more than `timeout` seconds in total, rather than `timeout`
+    # seconds after the last response. Drain entire queue on each wakeup.
     datagrams = []
-    try:
-        while True:
-            data, address = sock.recvfrom(MAX_BYTES)
+    receiver = BatchReceiver()
+    deadline = time.monotonic() + timeout
+    while (remaining := deadline - time.monotonic()) > 0:
+        ready, _, _ = select.select([sock], [], [], remaining)
+        if not ready:
+            break
+
+        for data, address in receiver.receive(sock):
             datagrams.append(Datagram(*address, data))
-    except TimeoutError:
-        pass
 
     return datagrams
 
@@ -69,7 +96,7 @@ if __name__ == '__main__':
     )
 
     returned = multicast_client(
-        MULTICAST_IP, MULTICAST_PORT, b"ID;", timeout=1.0,
+        MULTICAST_IP, MULTICAST_PORT, DISCOVERY_MESSAGE, timeout=1.0,
     )
     pp(returned)
     sys.exit(1)
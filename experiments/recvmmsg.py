@@ -0,0 +1,192 @@
+"""
+Receive a batch of UDP datagrams with a single system call.
+
+Linux's `recvmmsg(2)` fills many message headers at once, rather than paying
+for one kernel transition for every datagram as `socket.recvfrom()` does.
+Python does not wrap it, so we call into libc using `ctypes`.
+
+    receiver = BatchReceiver()
+    for data, address in receiver.receive(sock):
+        ...
+
+Other platforms fall back to calling `recvfrom()` until the queue is empty.
+
+Deliberately duplicated in `rocket_lab/_recvmmsg.py`, so that this script
+keeps running standalone. Keep the structure layouts of the two in step.
+"""
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import socket
+import sys
+
+
+logger = logging.getLogger(__name__)
+BATCH_SIZE = 32
+SLOT_BYTES = 2048
+
+
+class iovec(ctypes.Structure):
+    _fields_ = [
+        ("iov_base", ctypes.c_void_p),
+        ("iov_len", ctypes.c_size_t),
+    ]
+
+
+class sockaddr_in(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),
+        ("sin_addr", ctypes.c_uint8 * 4),
+        ("sin_zero", ctypes.c_uint8 * 8),
+    ]
+
+
+class msghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(iovec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class mmsghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_hdr", msghdr),
+        ("msg_len", ctypes.c_uint),
+    ]
+
+
+def _load_recvmmsg():
+    """
+    Find `recvmmsg()` in the C library, or None if not available.
+    """
+    if sys.platform != 'linux':
+        return None
+    libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    function = getattr(libc, 'recvmmsg', None)
+    if function is not None:
+        function.argtypes = [
+            ctypes.c_int,
+            ctypes.POINTER(mmsghdr),
+            ctypes.c_uint,
+            ctypes.c_int,
+            ctypes.c_void_p,
+        ]
+        function.restype = ctypes.c_int
+    return function
+
+
+_recvmmsg = _load_recvmmsg()
+
+
+class BatchReceiver:
+    """
+    Preallocated buffers and headers for repeated calls to `recvmmsg()`.
+
+    All payloads share one contiguous `bytearray`, with a fixed-size slot
+    for each message in the batch.
+    """
+    def __init__(self, count: int = BATCH_SIZE, size: int = SLOT_BYTES):
+        self.count = count
+        self.size = size
+        self.buffer = bytearray(count * size)
+        self.view = memoryview(self.buffer)
+        self.names = (sockaddr_in * count)()
+        self.iovecs = (iovec * count)()
+        self.headers = (mmsghdr * count)()
+
+        base = ctypes.addressof((ctypes.c_char * len(self.buffer)).from_buffer(
+            self.buffer
+        ))
+        for i in range(count):
+            self.iovecs[i].iov_base = base + i * size
+            self.iovecs[i].iov_len = size
+            header = self.headers[i].msg_hdr
+            header.msg_name = ctypes.addressof(self.names[i])
+            header.msg_iov = ctypes.pointer(self.iovecs[i])
+            header.msg_iovlen = 1
+
+    def receive(
+        self,
+        sock: socket.socket,
+        copy: bool = True,
+    ) -> list[tuple[bytes, tuple[str, int]]]:
+        """
+        Read every datagram already queued on socket, without blocking.
+
+        Args:
+            sock:
+                IPv4 UDP socket.
+            copy:
+                If false, return memoryview slices of the shared buffer
+                instead of `bytes`. Avoids all per-packet allocation, but
+                the views are only valid until the next receive on the
+                same socket, and only a single batch is read.
+
+        Returns:
+            List of (data, address) tuples, as per `socket.recvfrom()`.
+            Empty if nothing was waiting.
+        """
+        if _recvmmsg is None:
+            return self._receive_fallback(sock, copy)
+
+        received = []
+        while True:
+            for i in range(self.count):
+                self.headers[i].msg_hdr.msg_namelen = ctypes.sizeof(sockaddr_in)
+
+            num = _recvmmsg(
+                sock.fileno(), self.headers, self.count, socket.MSG_DONTWAIT, None,
+            )
+            if num < 0:
+                error = ctypes.get_errno()
+                if error in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise OSError(error, os.strerror(error))
+
+            for i in range(num):
+                header = self.headers[i]
+                if header.msg_hdr.msg_flags & socket.MSG_TRUNC:
+                    logger.warning("Datagram truncated to %s bytes", self.size)
+                name = self.names[i]
+                host = socket.inet_ntoa(bytes(name.sin_addr))
+                port = socket.ntohs(name.sin_port)
+                start = i * self.size
+                data = self.view[start:start + header.msg_len]
+                received.append((bytes(data) if copy else data, (host, port)))
+
+            # Short batch means the queue is now empty. Stop after one batch
+            # when handing out views, before the buffer gets overwritten.
+            if num < self.count or not copy:
+                break
+
+        return received
+
+    def _receive_fallback(
+        self,
+        sock: socket.socket,
+        copy: bool,
+    ) -> list[tuple[bytes, tuple[str, int]]]:
+        """
+        Read into the same slots, but one `recvfrom_into()` call at a time.
+        """
+        received = []
+        while copy or len(received) < self.count:
+            start = (len(received) % self.count) * self.size
+            slot = self.view[start:start + self.size]
+            try:
+                num, address = sock.recvfrom_into(
+                    slot, self.size, socket.MSG_DONTWAIT,
+                )
+            except BlockingIOError:
+                break
+            data = slot[:num]
+            received.append((bytes(data) if copy else data, address))
+        return received
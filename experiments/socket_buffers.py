@@ -0,0 +1,33 @@
+"""
+Enlarge UDP socket buffers, shared by the experiments.
+
+A burst of datagrams can overflow the small default receive buffer, causing
+the kernel to silently drop them before we get a chance to read them.
+"""
+import logging
+import socket
+
+
+logger = logging.getLogger(__name__)
+BUFFER_SIZE = 7 * 1024 * 1024
+FALLBACK_BUFFER_SIZE = 1024 * 1024
+
+
+def set_buffer_sizes(sock: socket.socket, size: int = BUFFER_SIZE) -> int:
+    """
+    Enlarge socket's send and receive buffers, falling back to 1MB if refused.
+
+    Returns:
+        Receive buffer size granted by the OS. Linux doubles the request.
+    """
+    for requested in (size, FALLBACK_BUFFER_SIZE):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, requested)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, requested)
+        except OSError as e:
+            logger.debug("Buffer size of %s bytes refused: %s", requested, e)
+        else:
+            break
+    granted = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    logger.debug("Socket receive buffer is %s bytes", granted)
+    return granted
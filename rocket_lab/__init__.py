@@ -3,3 +3,4 @@ DEFAULT_ENCODING = 'ISO-8859-1'     # Latin-1
 DEFAULT_HOSTNAME = "0.0.0.0"
 DEFAULT_MULTICAST_IP = "224.3.11.15"
 DEFAULT_MULTICAST_PORT = 31115
+DEFAULT_SOCKET_BUFFER = 7 * 1024 * 1024     # Bytes
@@ -7,7 +7,7 @@ Run the command-line application if arguments given, otherwise start the GUI.
 import logging
 import sys
 
-from . import command_line, gui
+from . import command_line
 
 
 logger = logging.getLogger(__name__)
@@ -17,7 +17,9 @@ def main(options: command_line.Options) -> int:
     """
     Application entry point.
 
-    Start GUI if no commmand-line options given.
+    Start GUI if no commmand-line options given. The GUI module is only
+    imported when needed, so that the command-line does not pay the
+    considerable cost of loading PyQt5.
     """
     match options.command:
         case 'discover':
@@ -25,13 +27,15 @@ def main(options: command_line.Options) -> int:
         case 'test':
             return command_line.run_device_test(options)
         case _:
+            from . import gui
             return gui.main(options)
 
 
 if __name__ == '__main__':
-    options = command_line.parse(sys.argv)
+    options = command_line.parse(sys.argv[1:])
     logging.basicConfig(
         format="%(levelname)-7s %(message)s",
         level=logging.DEBUG if options.verbose else logging.INFO,
     )
+    logger.debug("Parsed options: %r", options)
     sys.exit(main(options))
@@ -0,0 +1,206 @@
+"""
+Receive a batch of UDP datagrams with a single system call.
+
+Linux's `recvmmsg(2)` fills many message headers at once, rather than paying
+for one kernel transition for every datagram as `socket.recvmsg()` does.
+Python does not wrap it, so we call into libc using `ctypes`.
+
+Ported from `experiments/recvmmsg.py`, with the addition of ancillary data so
+that `IP_PKTINFO` still works. The experiments are standalone scripts, run
+from their own folder without this package installed, so each keeps its own
+copy of the `ctypes` structures.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import socket
+import struct
+import sys
+
+
+logger = logging.getLogger(__name__)
+BATCH_SIZE = 32
+SLOT_BYTES = 2048
+
+# Header of each control message: `struct cmsghdr` from <sys/socket.h>
+CMSGHDR = struct.Struct("@Nii")
+CMSG_ALIGNMENT = ctypes.sizeof(ctypes.c_size_t)
+
+
+class iovec(ctypes.Structure):
+    _fields_ = [
+        ("iov_base", ctypes.c_void_p),
+        ("iov_len", ctypes.c_size_t),
+    ]
+
+
+class sockaddr_in(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),
+        ("sin_addr", ctypes.c_uint8 * 4),
+        ("sin_zero", ctypes.c_uint8 * 8),
+    ]
+
+
+class msghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(iovec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class mmsghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_hdr", msghdr),
+        ("msg_len", ctypes.c_uint),
+    ]
+
+
+def _load_recvmmsg():
+    """
+    Find `recvmmsg()` in the C library, or None if not available.
+    """
+    if sys.platform != 'linux':
+        return None
+    libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    function = getattr(libc, 'recvmmsg', None)
+    if function is not None:
+        function.argtypes = [
+            ctypes.c_int,
+            ctypes.POINTER(mmsghdr),
+            ctypes.c_uint,
+            ctypes.c_int,
+            ctypes.c_void_p,
+        ]
+        function.restype = ctypes.c_int
+    return function
+
+
+_recvmmsg = _load_recvmmsg()
+AVAILABLE = _recvmmsg is not None
+
+
+def _address_of(buffer: bytearray) -> int:
+    """
+    Memory address of start of given buffer's contents.
+    """
+    return ctypes.addressof((ctypes.c_char * len(buffer)).from_buffer(buffer))
+
+
+def _parse_ancillary(control: memoryview) -> list[tuple[int, int, bytes]]:
+    """
+    Split raw control buffer into items, as per `socket.recvmsg()`.
+    """
+    items = []
+    offset = 0
+    while offset + CMSGHDR.size <= len(control):
+        length, level, kind = CMSGHDR.unpack_from(control, offset)
+        if length < CMSGHDR.size:
+            break
+        payload = control[offset + CMSGHDR.size:offset + length]
+        items.append((level, kind, bytes(payload)))
+        offset += (length + CMSG_ALIGNMENT - 1) & ~(CMSG_ALIGNMENT - 1)
+    return items
+
+
+class BatchReceiver:
+    """
+    Preallocated buffers and headers for repeated calls to `recvmmsg()`.
+
+    All payloads share one contiguous `bytearray`, with a fixed-size slot
+    for each message in the batch. Control messages likewise share another.
+    """
+    def __init__(
+        self,
+        count: int = BATCH_SIZE,
+        size: int = SLOT_BYTES,
+        ancillary_size: int = 0,
+    ):
+        self.count = count
+        self.size = size
+        self.ancillary_size = ancillary_size
+        self.buffer = bytearray(count * size)
+        self.view = memoryview(self.buffer)
+        self.control = bytearray(max(count * ancillary_size, 1))
+        self.control_view = memoryview(self.control)
+        self.names = (sockaddr_in * count)()
+        self.iovecs = (iovec * count)()
+        self.headers = (mmsghdr * count)()
+
+        base = _address_of(self.buffer)
+        control_base = _address_of(self.control)
+        for i in range(count):
+            self.iovecs[i].iov_base = base + i * size
+            self.iovecs[i].iov_len = size
+            header = self.headers[i].msg_hdr
+            header.msg_name = ctypes.addressof(self.names[i])
+            header.msg_iov = ctypes.pointer(self.iovecs[i])
+            header.msg_iovlen = 1
+            if ancillary_size:
+                header.msg_control = control_base + i * ancillary_size
+
+    def receive(
+        self,
+        sock: socket.socket,
+    ) -> list[tuple[bytes, list[tuple[int, int, bytes]], tuple[str, int]]]:
+        """
+        Read every datagram already queued on socket, without blocking.
+
+        Args:
+            sock:
+                IPv4 UDP socket.
+
+        Raises:
+            OSError:
+                If `recvmmsg()` fails for any reason other than an empty queue.
+
+        Returns:
+            List of (data, ancillary, address) tuples, similar to those from
+            `socket.recvmsg()`. Empty if nothing was waiting.
+        """
+        received = []
+        while True:
+            for i in range(self.count):
+                header = self.headers[i].msg_hdr
+                header.msg_namelen = ctypes.sizeof(sockaddr_in)
+                header.msg_controllen = self.ancillary_size
+
+            num = _recvmmsg(
+                sock.fileno(), self.headers, self.count, socket.MSG_DONTWAIT, None,
+            )
+            if num < 0:
+                error = ctypes.get_errno()
+                if error in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise OSError(error, os.strerror(error))
+
+            for i in range(num):
+                header = self.headers[i]
+                if header.msg_hdr.msg_flags & socket.MSG_TRUNC:
+                    logger.warning("Datagram truncated to %s bytes", self.size)
+                name = self.names[i]
+                host = socket.inet_ntoa(bytes(name.sin_addr))
+                port = socket.ntohs(name.sin_port)
+                start = i * self.size
+                data = bytes(self.view[start:start + header.msg_len])
+                ancillary = []
+                if self.ancillary_size:
+                    start = i * self.ancillary_size
+                    end = start + header.msg_hdr.msg_controllen
+                    ancillary = _parse_ancillary(self.control_view[start:end])
+                received.append((data, ancillary, (host, port)))
+
+            # Short batch means the queue is now empty
+            if num < self.count:
+                break
+
+        return received
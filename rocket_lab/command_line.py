@@ -3,11 +3,17 @@ Command-line argument parsing and subcommand implementation.
 """
 import argparse
 from argparse import ArgumentTypeError
-from pprint import pprint as pp
+from functools import lru_cache
 from typing import TypeAlias
 
-from . import networking, DEFAULT_MULTICAST_IP, DEFAULT_MULTICAST_PORT
-from .data import DiscoveryData, StatusData
+from . import (
+    networking,
+    DEFAULT_MULTICAST_IP,
+    DEFAULT_MULTICAST_PORT,
+    DEFAULT_SOCKET_BUFFER,
+)
+from .data import DiscoveryData, RunningAggregates
+from .udp import check_address
 
 
 Options: TypeAlias = argparse.Namespace
@@ -17,8 +23,8 @@ def argparse_address_tuple(string: str) -> tuple[str, int]:
     """
     Convert and validate string argument containing IP address and port number.
 
-    Don't try and parse the IP address here, that will just double up the
-    processing done later.
+    Only IPv4 addresses are accepted, so that the user gets a usage error
+    straight away, rather than a hostname being looked up later.
 
     Args:
         string:
@@ -26,24 +32,75 @@ def argparse_address_tuple(string: str) -> tuple[str, int]:
 
     Raises:
         argparse.ArgumentTypeError:
-            If path does not exist.
+            If address or port number is invalid.
 
     Returns:
         2-tuple containing IP address and port number.
     """
-    parts = string.rsplit(":", maxsplit=1)
-    address = parts[0]
+    address, separator, port_string = string.rpartition(":")
+    if not separator:
+        raise ArgumentTypeError("Port number missing. Use colon to separate.")
+
     port: int
     try:
-        port = int(parts[1])
-    except IndexError:
-        raise ArgumentTypeError("Port number missing. Use colon to separate.")
+        port = int(port_string)
     except ValueError:
         raise ArgumentTypeError(
-            f"Invalid port number. Expected integer, given {parts[1]!r}"
+            f"Invalid port number. Expected integer, given {port_string!r}"
         )
 
-    return (address, port)
+    return (argparse_ip_address(address), port)
+
+
+def argparse_ip_address(string: str) -> str:
+    """
+    Validate string argument containing an IPv4 address.
+
+    Args:
+        string:
+            IP address, eg. '192.168.0.10'
+
+    Raises:
+        argparse.ArgumentTypeError:
+            If string is not a dotted-quad IPv4 address, eg. a hostname.
+
+    Returns:
+        The given IP address.
+    """
+    try:
+        check_address(string)
+    except ValueError as e:
+        raise ArgumentTypeError(str(e)) from None
+    return string
+
+
+def argparse_buffer_size(string: str) -> int:
+    """
+    Convert and validate string argument containing socket buffer size.
+
+    Args:
+        string:
+            Size in bytes, eg. '7340032'
+
+    Raises:
+        argparse.ArgumentTypeError:
+            If size is not a positive integer.
+
+    Returns:
+        Buffer size in bytes.
+    """
+    try:
+        size = int(string)
+    except ValueError:
+        raise ArgumentTypeError(
+            f"Invalid buffer size. Expected integer, given {string!r}"
+        ) from None
+
+    if size <= 0:
+        raise ArgumentTypeError(
+            f"Invalid buffer size. Expected positive integer, given {size}"
+        )
+    return size
 
 
 def run_discovery(options: Options) -> int:
@@ -59,14 +116,20 @@ def run_discovery(options: Options) -> int:
     """
     multicast_ip, multicast_port = options.multicast
     devices = networking.discover_devices(
-        multicast_ip, multicast_port, timeout=options.timeout,
+        multicast_ip,
+        multicast_port,
+        timeout=options.timeout,
+        buffer_size=options.socket_buffer,
+        interface=options.interface,
+        loopback=options.loopback,
     )
-    print(f"{len(devices)} devices responded to discovery:")
-    for device in devices:
-        print(
-            f"{device.model:<6} {device.serial:<12} "
-            f"{device.address}:{device.port}"
-        )
+    # Build output first, so that a line-buffered terminal is written once
+    lines = [f"{len(devices)} devices responded to discovery:"]
+    lines.extend([
+        f"{device.model:<6} {device.serial:<12} {device.address}:{device.port}"
+        for device in devices
+    ])
+    print("\n".join(lines))
 
 
 def run_device_test(options: Options) -> int:
@@ -90,35 +153,45 @@ def run_device_test(options: Options) -> int:
     )
 
     # Print and collect data as it comes in
-    runner = networking.test_device(
+    runner = networking.test_device_status(
         address,
         port,
         duration,
         rate,
         timeout=options.timeout,
+        buffer_size=options.socket_buffer,
     )
-    ma_history = []
-    mv_history = []
-    for message in runner:
-        status = StatusData.from_message(message)
-        ma_history.append(status.ma)
-        mv_history.append(status.mv)
-        ma = f"{status.ma:,.2f}mA"
-        mv = f"{status.mv:,.2f}mV"
-        print(f"{status.time*1000:>6,.0f} milliseconds: {ma:>12} {mv:>12}")
+    # Keep running aggregates rather than a history of every sample. Print
+    # roughly ten samples per second, as fast rates would flood the terminal.
+    ma_aggregates = RunningAggregates()
+    mv_aggregates = RunningAggregates()
+    print_every = max(1, 100 // max(rate, 1))
+    for time, ma, mv in runner:
+        ma_aggregates.add(ma)
+        mv_aggregates.add(mv)
+        if ma_aggregates.count % print_every == 0:
+            ma_string = f"{ma:,.2f}mA"
+            mv_string = f"{mv:,.2f}mV"
+            print(
+                f"{time*1000:>6,.0f} milliseconds: "
+                f"{ma_string:>12} {mv_string:>12}"
+            )
 
     # Print aggregate data
-    def aggregates(values: list[float]) -> (str, str, str):
+    def aggregates(values: RunningAggregates) -> tuple[str, str, str]:
         """
-        Calcuate, format, and return mean, max, and min - and in that order.
+        Format and return mean, max, and min - and in that order.
         """
-        mean = sum(values) / len(values)
-        return (f"{mean:,.2f}", f"{max(values):,.2f}", f"{min(values):,.2f}")
+        return (
+            f"{values.mean:,.2f}",
+            f"{values.maximum:,.2f}",
+            f"{values.minimum:,.2f}",
+        )
 
-    ma_mean, ma_max, ma_min  = aggregates(ma_history)
+    ma_mean, ma_max, ma_min  = aggregates(ma_aggregates)
     print(f"Current mean {ma_mean}mA, max {ma_max}mA, min {ma_min}mA")
 
-    mv_mean, mv_max, mv_min  = aggregates(mv_history)
+    mv_mean, mv_max, mv_min  = aggregates(mv_aggregates)
     print(f"Voltage mean  {mv_mean}mV, max {mv_max}mV, min {mv_min}mV")
 
 
@@ -128,11 +201,22 @@ def parse(arguments: list[str]) -> Options:
 
     Args:
         arguments:
-            Plain list of strings, either from sys.args or test code.
+            Plain list of strings, either from sys.argv[1:] or test code.
 
     Returns:
         Options extracted from given arguments.
     """
+    return _build_parser().parse_args(arguments)
+
+
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Build parser for command-line arguments, once only.
+
+    Built on first use, rather than at import, so that importing this module
+    (eg. from the GUI or tests) does not pay for it either.
+    """
     # Global arguments
     parser = argparse.ArgumentParser(
         prog="rocket_lab",
@@ -148,6 +232,27 @@ def parse(arguments: list[str]) -> Options:
         type=argparse_address_tuple,
         help=f"Multicast IP address and port (default {multicast_default})",
     )
+    parser.add_argument(
+        '--interface',
+        metavar='ADDRESS',
+        type=argparse_ip_address,
+        help="IP address of local interface to send multicast from",
+    )
+    parser.add_argument(
+        '--no-loopback',
+        action='store_false',
+        dest='loopback',
+        help="Don't send multicast to devices running on this host",
+    )
+    parser.add_argument(
+        '--socket-buffer',
+        metavar='BYTES',
+        type=argparse_buffer_size,
+        help=(
+            "Size of UDP socket send and receive buffers "
+            f"(default {DEFAULT_SOCKET_BUFFER:,})"
+        ),
+    )
     parser.add_argument(
         '-t', '--timeout',
         default=1.0,
@@ -201,5 +306,4 @@ def parse(arguments: list[str]) -> Options:
         help='Start PyQT graphical user interface (default)',
     )
 
-    options = parser.parse_args()
-    return options
+    return parser
@@ -15,8 +15,10 @@ went wrong. Callers must ensure that the handle that exception.
 """
 
 from dataclasses import dataclass
-from functools import total_ordering
 import logging
+import math
+import re
+import sys
 from typing import Self
 
 from . import DEFAULT_ENCODING
@@ -25,6 +27,13 @@ from .udp import Datagram
 
 logger = logging.getLogger(__name__)
 
+# Status message exactly as sent by DUT, eg. b"STATUS;TIME=100;MV=3332;MA=45;"
+_STATUS_PATTERN = re.compile(rb"STATUS;TIME=([^;=]*);MV=([^;=]*);MA=([^;=]*);")
+_STATUS_STRING_PATTERN = re.compile(_STATUS_PATTERN.pattern.decode('ascii'))
+
+# Discovery reply exactly as sent by DUT, eg. "ID;MODEL=M001;SERIAL=SN0123457;"
+_ID_STRING_PATTERN = re.compile(r"ID;MODEL=([^;=]*);SERIAL=([^;=]*);")
+
 
 @dataclass(eq=True, frozen=True, slots=True)
 class DeviceMessage:
@@ -57,38 +66,45 @@ class DeviceMessage:
         Returns:
             Data instance
         """
-        string = binary.decode(DEFAULT_ENCODING, errors='replace')
-        parts = string.split(";")
-        name = parts[0]
+        # Latin-1 maps every possible byte, so decoding cannot fail. Passing
+        # an `errors` handler anyway takes a noticeably slower code path.
+        string = binary.decode(DEFAULT_ENCODING)
+
+        # Fast path for status messages, which make up almost all traffic
+        if string.startswith("STATUS;"):
+            match = _STATUS_STRING_PATTERN.fullmatch(string)
+            if match is not None:
+                time, mv, ma = match.groups()
+                data = {'TIME': time, 'MV': mv, 'MA': ma}
+                return DeviceMessage('STATUS', data)
+
+        name, _, rest = string.partition(";")
         data = {}
-        for part in parts[1:]:
+        for part in rest.split(";"):
             if not part:
                 continue
 
-            entry = part.split("=")
-            if len(entry) == 2:
-                data[entry[0]] = entry[1]
-            else:
+            # Partition avoids building a throwaway list for every field
+            key, equals, value = part.partition("=")
+            if not equals or "=" in value:
                 raise ValueError(f"Could not parse {part} from {binary!r}")
+            data[key] = value
 
         if not name:
             raise ValueError("Empty message")
 
-        return DeviceMessage(name, data)
+        # Only a handful of message names, share one string object for each
+        return DeviceMessage(sys.intern(name), data)
 
     def to_string(self) -> str:
         """
         Serialise data to semi-colon delimited string.
         """
-        # Serialise name and key/value pairs
-        parts = [self.name]
-        for k, v in self.data.items():
-            parts.append(f"{k}={v}")
-
-        # Insert semicolons, including one at end of message!
-        parts = [f"{part};" for part in parts]
-        string = "".join(parts)
-        return string
+        # Serialise name and key/value pairs, each followed by a semicolon,
+        # including one at end of message!
+        parts = [f"{self.name};"]
+        parts.extend([f"{k}={v};" for k, v in self.data.items()])
+        return "".join(parts)
 
     def to_bytes(self) -> bytes:
         """
@@ -97,7 +113,6 @@ class DeviceMessage:
         return self.to_string().encode(DEFAULT_ENCODING, errors="replace")
 
 
-@total_ordering
 @dataclass(eq=True, frozen=True, slots=True)
 class DiscoveryData:
     """
@@ -114,12 +129,21 @@ class DiscoveryData:
     model: str
     serial: str
 
+    # Support ordering of devices by model, then serial number. Written out
+    # in full as `functools.total_ordering` adds a layer of indirection, but
+    # derived from `__lt__()` and `__eq__()` exactly as it would do.
     def __lt__(self, other: Self) -> bool:
-        """
-        Support ordering of devices by model, then serial number.
-        """
         return (self.model, self.serial) < (other.model, other.serial)
 
+    def __le__(self, other: Self) -> bool:
+        return self < other or self == other
+
+    def __gt__(self, other: Self) -> bool:
+        return not self < other and self != other
+
+    def __ge__(self, other: Self) -> bool:
+        return not self < other
+
     @classmethod
     def from_datagram(cls, datagram: Datagram) -> Self:
         """
@@ -141,10 +165,19 @@ class DiscoveryData:
         """
         address = datagram.address
         port = datagram.port
-        message = DeviceMessage.from_bytes(datagram.data)
+
+        # Fast path for replies in the exact form sent by the DUT
+        string = datagram.data.decode(DEFAULT_ENCODING)
+        match = _ID_STRING_PATTERN.fullmatch(string)
+        if match is not None:
+            model, serial = match.groups()
+            return DiscoveryData(address, port, sys.intern(model), serial)
 
         try:
-            model = message.data['MODEL']
+            message = DeviceMessage.from_bytes(datagram.data)
+
+            # Few distinct models, but many devices of each
+            model = sys.intern(message.data['MODEL'])
             serial = message.data['SERIAL']
         except KeyError as e:
             raise RuntimeError(f"Device data missing: {e} not found")
@@ -187,6 +220,40 @@ class StatusData:
     mv: float       # Millivolts reported
     time: float     # Seconds since test started
 
+    @staticmethod
+    def parse_scalars(binary: bytes) -> tuple[float, float, float]:
+        """
+        Parse status data from device into a plain tuple of floats.
+
+        Messages in the exact field order sent by the DUT are matched by a
+        precompiled regular expression, skipping the construction of a
+        `DeviceMessage`. Anything else takes the general-purpose route.
+
+        Avoiding the creation of a dataclass instance is worthwhile if the
+        caller only wants the values, eg. to update running aggregates.
+
+        Args:
+            binary:
+                Raw message from device.
+
+        Raises:
+            ValueError:
+                If any errors encountered in given messsage.
+
+        Returns:
+            3-tuple of seconds since test started, milliamps, and millivolts.
+        """
+        match = _STATUS_PATTERN.fullmatch(binary)
+        if match is None:
+            status = StatusData.from_message(DeviceMessage.from_bytes(binary))
+            return (status.time, status.ma, status.mv)
+
+        time, mv, ma = match.groups()
+        try:
+            return (float(time) / 1000.0, float(ma), float(mv))
+        except ValueError as e:
+            raise ValueError(f"Invalid status data: {e}")
+
     @classmethod
     def from_message(self, message: DeviceMessage) -> Self:
         """
@@ -218,3 +285,38 @@ class StatusData:
             raise ValueError(f"Invalid status data: {e}")
 
         return StatusData(ma, mv, time)
+
+
+@dataclass(slots=True)
+class RunningAggregates:
+    """
+    Mean, maximum, and minimum over a stream of values.
+
+    Updated as each value arrives, so no history needs to be kept and no
+    second pass over the data is needed at the end of a test.
+    """
+    count: int = 0
+    total: float = 0.0
+    maximum: float = -math.inf
+    minimum: float = math.inf
+
+    def add(self, value: float) -> None:
+        """
+        Include another value in aggregates.
+        """
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+        if value < self.minimum:
+            self.minimum = value
+
+    @property
+    def mean(self) -> float:
+        """
+        Arithmetic mean of values so far, or NaN if there are none.
+        """
+        if not self.count:
+            return math.nan
+        return self.total / self.count
+
@@ -0,0 +1,95 @@
+"""
+Remember devices found by the last discovery, between runs of the GUI.
+
+Lets the GUI show the devices it saw a moment ago straight away, while a
+fresh discovery runs in the background.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+import time
+
+from .data import DiscoveryData
+
+
+logger = logging.getLogger(__name__)
+DEFAULT_TTL = 30.0      # Seconds
+
+
+def default_path() -> Path:
+    """
+    Location of cache file, following the XDG base directory convention.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'rocket_lab' / 'devices.json'
+
+
+def load(path: Path | None = None) -> list[DiscoveryData]:
+    """
+    Load devices saved by `save()`, if not yet expired.
+
+    Problems reading the cache are logged, but are never fatal.
+
+    Args:
+        path:
+            Cache file to read. Use `default_path()` if not given.
+
+    Returns:
+        List of devices. Empty if cache is missing, expired, or invalid.
+    """
+    path = default_path() if path is None else path
+    try:
+        with open(path, encoding='utf-8') as fp:
+            cache = json.load(fp)
+        if time.time() > cache['expires']:
+            return []
+        return [DiscoveryData(**device) for device in cache['devices']]
+    except FileNotFoundError:
+        return []
+    except (OSError, KeyError, TypeError, ValueError) as e:
+        logger.warning("Ignoring invalid device cache %s: %s", path, e)
+        return []
+
+
+def save(
+    devices: list[DiscoveryData],
+    ttl: float = DEFAULT_TTL,
+    path: Path | None = None,
+) -> None:
+    """
+    Save devices for a later call to `load()`.
+
+    The file is replaced atomically, so a concurrent `load()` never sees
+    a partly written cache.
+
+    Args:
+        devices:
+            List of devices to remember.
+        ttl:
+            Seconds until cache expires.
+        path:
+            Cache file to write. Use `default_path()` if not given.
+    """
+    path = default_path() if path is None else path
+    cache = {
+        'expires': time.time() + ttl,
+        'devices': [
+            {
+                'address': device.address,
+                'port': device.port,
+                'model': device.model,
+                'serial': device.serial,
+            }
+            for device in devices
+        ],
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix('.tmp')
+        with open(temporary, 'w', encoding='utf-8') as fp:
+            json.dump(cache, fp)
+        os.replace(temporary, path)
+    except OSError as e:
+        logger.warning("Could not save device cache %s: %s", path, e)
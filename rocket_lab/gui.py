@@ -3,12 +3,12 @@ Create PyQT5 GUI for running device tests and collecting resultant data.
 
 CamelCase style should be used in this module to match the PyQT5 API style.
 """
+import bisect
 from functools import partial
 import logging
-from pprint import pprint as pp
-import time
+from operator import attrgetter
 
-from PyQt5.QtCore import QSize, Qt, QThread
+from PyQt5.QtCore import pyqtSignal, QSize, Qt, QThread
 from PyQt5.QtWidgets import (
     QApplication,
     QButtonGroup,
@@ -25,12 +25,19 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
-from . import command_line, networking
+from . import command_line, device_cache, networking
 from .data import DiscoveryData as Device, StatusData
 
 
 logger = logging.getLogger(__name__)
 
+# Parsed once for the whole application, rather than once per widget
+STYLE_SHEET = """
+DeviceButton, QPushButton[large="true"] {
+    padding: 20px;
+}
+"""
+
 
 def main(options: command_line.Options) -> int:
     """
@@ -38,6 +45,7 @@ def main(options: command_line.Options) -> int:
     """
     logger.info("Starting GUI...")
     app = QApplication([])
+    app.setStyleSheet(STYLE_SHEET)
     window = MainWindow(options)
     window.show()
     app.exec()
@@ -59,9 +67,10 @@ class MainWindow(QWidget):
     """
     def __init__(self, options: command_line.Options):
         super().__init__()
-        # Quick device search to start with
         self.options = options
-        self.devices = self.findDevices(timeout=0.2)
+
+        # Only the most recent device search is used to update the navigation
+        self.deviceSearch = None
 
         # Main window
         self.setWindowTitle("Leon's Rocket Lab Production Automation Test")
@@ -72,7 +81,7 @@ class MainWindow(QWidget):
         layout = QHBoxLayout()
 
         # Navigation
-        self.navigation = Navigation(self.devices)
+        self.navigation = Navigation([])
         layout.addLayout(self.navigation)
 
         # Stack of device detailsnavigation and device details
@@ -81,15 +90,43 @@ class MainWindow(QWidget):
 
         self.setLayout(layout)
 
-    def findDevices(self, *, timeout: float) -> list[Device]:
+        # Show devices from last time straight away, while a quick device
+        # search runs without delaying first paint
+        for device in device_cache.load():
+            self.navigation.addDevice(device)
+        self.findDevices(timeout=0.2)
+
+    def findDevices(self, *, timeout: float) -> None:
         """
         Search for devices using multicast UDP networking.
+
+        Runs in a background thread. Devices are added to the navigation
+        as each one responds. Starting a new search supersedes any search
+        still running, whose results are then ignored.
         """
-        multicast_ip, multicast_port = self.options.multicast
-        devices = networking.discover_devices(
-            multicast_ip, multicast_port, timeout=timeout,
-        )
-        return devices
+        worker = DeviceListUpdater(self, self.options, timeout)
+        self.deviceSearch = worker
+        worker.deviceFound.connect(partial(self.deviceFound, worker))
+        worker.finished.connect(partial(self.updateDeviceListFinished, worker))
+        worker.start()
+
+    def closeEvent(self, event):
+        """
+        Wait for device searches to finish before the window is destroyed.
+
+        Qt aborts if a running thread is destroyed along with its parent.
+        Searches always end after their timeout, so this wait is short.
+        """
+        for worker in self.findChildren(DeviceListUpdater):
+            worker.wait()
+        super().closeEvent(event)
+
+    def deviceFound(self, worker: "DeviceListUpdater", device: Device):
+        """
+        Add newly discovered device to navigation, unless search is stale.
+        """
+        if worker is self.deviceSearch:
+            self.navigation.addDevice(device)
 
     def selectDevice(self, device: Device):
         """
@@ -102,29 +139,63 @@ class MainWindow(QWidget):
     def updateDeviceList(self):
         """
         Update list of devices.
-
-        Rather than start another background thread, we're going to pop
-        up a modal dialog for just a couple of seconds until the operation
-        concludes - we don't want users interacting with elements that are
-        about to disapear after all!
         """
         logger.info("Updating device list")
-        worker = DeviceListUpdater(self)
-        worker.finished.connect(self.updateDeviceListFinished)
-        worker.start()
+        self.findDevices(timeout=self.options.timeout)
 
-    def updateDeviceListFinished(self):
+    def updateDeviceListFinished(self, worker: "DeviceListUpdater"):
         logger.info("updateDeviceListFinished")
+        worker.deleteLater()
+        if worker is not self.deviceSearch:
+            logger.debug("Ignoring results from superseded device search")
+            return
+        self.deviceSearch = None
+
+        # Keep buttons for devices found previously if the search failed
+        if worker.failed:
+            return
+        self.navigation.updateButtonGroup(worker.devices)
+        device_cache.save(worker.devices)
 
 
 class DeviceListUpdater(QThread):
-    def __init__(self, parent):
+    """
+    Run multicast discovery in a background thread.
+
+    Emits `deviceFound` for every device as soon as it responds. Qt queues
+    the signal across to the GUI thread for us.
+
+    Errors are logged rather than raised, as PyQt aborts the application on
+    exceptions escaping from `run()`. Devices found before the error are kept,
+    and `failed` is set.
+    """
+    deviceFound = pyqtSignal(object)
+
+    def __init__(self, parent, options: command_line.Options, timeout: float):
         super().__init__(parent)
+        self.options = options
+        self.timeout = timeout
+        self.devices = []
+        self.failed = False
 
     def run(self):
-        time.sleep(1)
         logger.debug("DeviceListUpdater.run()")
-        self.devices = [1, 1, 2, 3, 5, 8, 13]
+        multicast_ip, multicast_port = self.options.multicast
+        devices = networking.iter_discover_devices(
+            multicast_ip,
+            multicast_port,
+            timeout=self.timeout,
+            buffer_size=self.options.socket_buffer,
+            interface=self.options.interface,
+            loopback=self.options.loopback,
+        )
+        try:
+            for device in devices:
+                self.devices.append(device)
+                self.deviceFound.emit(device)
+        except (OSError, ValueError) as e:
+            logger.error("Device discovery failed: %s", e)
+            self.failed = True
 
 
 class Aggregates(QVBoxLayout):
@@ -198,12 +269,12 @@ class DeviceDetails(QVBoxLayout):
         layout = QHBoxLayout()
 
         stop = QPushButton("Stop")
-        stop.setStyleSheet("padding: 20px;")
+        stop.setProperty("large", True)
         layout.addWidget(stop)
 
         # Put start button in bottom right corner
         start = QPushButton("Start")
-        start.setStyleSheet("padding: 20px;")
+        start.setProperty("large", True)
         layout.addWidget(start)
 
         self.addLayout(layout)
@@ -225,15 +296,16 @@ class Navigation(QVBoxLayout):
         """
         super().__init__()
         self.setAlignment(Qt.AlignTop)
-        self.devices = devices
+        self.devices = []
+        self.deviceButtons = {}
         self._create_layout()
+        self.updateButtonGroup(devices)
 
     def _create_layout(self):
         # Device buttons
         self.buttonGroup = QButtonGroup()
         self.buttonGroup.setExclusive(True)
         self.buttonGroup.buttonClicked.connect(self.deviceButtonClicked)
-        self.updateButtonGroup()
 
         # Refresh button
         self.addStretch(1)
@@ -241,20 +313,56 @@ class Navigation(QVBoxLayout):
         refreshButton.clicked.connect(self.refreshButtonClicked)
         self.addWidget(refreshButton)
 
-    def updateButtonGroup(self):
+    def updateButtonGroup(self, devices: list[Device]):
         """
         Add/remove buttons from navigation using new list of devices.
 
-        If new list of devices matches old, nothing changes. Internal cache
-        of devices is updated.
+        If new list of devices matches old, nothing changes. Only buttons
+        for devices that have appeared or disappeared are created or
+        destroyed. Internal cache of devices is updated.
         """
-        self.deviceButtons = {}
-        for device in self.devices:
-            button = DeviceButton(device)
-            self.addWidget(button)
-            self.addSpacing(10)
-            self.buttonGroup.addButton(button)
-            self.deviceButtons[device] = button
+        current = {(device.model, device.serial) for device in devices}
+        for index in reversed(range(len(self.devices))):
+            device = self.devices[index]
+            if (device.model, device.serial) not in current:
+                self.removeDevice(index)
+        for device in devices:
+            self.addDevice(device)
+
+    def addDevice(self, device: Device):
+        """
+        Add button for newly discovered device, keeping buttons sorted.
+
+        Buttons are keyed by model and serial number, so a device already
+        shown keeps its button, but has its address updated.
+        """
+        key = (device.model, device.serial)
+        button = self.deviceButtons.get(key)
+        sortKey = attrgetter('model', 'serial')
+        index = bisect.bisect_left(self.devices, key, key=sortKey)
+        if button is not None:
+            button.device = device
+            self.devices[index] = device
+            return
+        self.devices.insert(index, device)
+
+        # Every button is followed by its spacer
+        button = DeviceButton(device)
+        self.insertWidget(index * 2, button)
+        self.insertSpacing(index * 2 + 1, 10)
+        self.buttonGroup.addButton(button)
+        self.deviceButtons[key] = button
+
+    def removeDevice(self, index: int):
+        """
+        Remove button, and its spacer, for device at given index.
+        """
+        device = self.devices.pop(index)
+        button = self.deviceButtons.pop((device.model, device.serial))
+        self.takeAt(index * 2 + 1)
+        self.takeAt(index * 2)
+        self.buttonGroup.removeButton(button)
+        button.deleteLater()
 
     def deviceButtonClicked(self):
         button = self.buttonGroup.checkedButton()
@@ -273,7 +381,6 @@ class DeviceButton(QPushButton):
         self.device = device
         self.setCheckable(True)
         self.setText(f"{self.device.model} {self.device.serial}")
-        self.setStyleSheet("padding: 20px;")
 
 
 class StartForm(QFormLayout):
@@ -2,20 +2,26 @@
 Rocket Lab specific UDP communication with DUT simulator.
 """
 
+from functools import lru_cache
 import logging
+from operator import attrgetter
 from typing import Iterator
 
-from .data import DeviceMessage, DiscoveryData
-from .udp import udp_client, udp_multicast_client
+from .data import DeviceMessage, DiscoveryData, StatusData
+from .udp import iter_udp_multicast, udp_client, udp_clients
 
 
 logger = logging.getLogger(__name__)
+_DISCOVERY_MESSAGE = b"ID;"
 
 
 def discover_devices(
     multicast_ip: str,
     multicast_port: int,
     timeout: float,
+    buffer_size: int | None = None,
+    interface: str | None = None,
+    loopback: bool = True,
 ) -> list[DiscoveryData]:
     """
     Discover device simultors on the network using multicast UDP.
@@ -29,37 +35,80 @@ def discover_devices(
             Port number to use, eg. 31115
         timeout:
             How long to wait for responses.
+        buffer_size:
+            Socket buffer size in bytes, `DEFAULT_SOCKET_BUFFER` if not given.
+        interface:
+            IP address of local interface to send multicast from.
+        loopback:
+            Also discover devices running on this host.
 
     Returns:
         List of `DiscoveryData` instances, one per device.
     """
-    # Send multicast, collect responses
-    found = udp_multicast_client(
+    devices = list(iter_discover_devices(
         multicast_ip,
-        multicast_port, b"ID;",
+        multicast_port,
         timeout=timeout,
-    )
-
-    # Parse and print device details
-    devices = DiscoveryData.from_datagrams(found)
+        buffer_size=buffer_size,
+        interface=interface,
+        loopback=loopback,
+    ))
     logger.info(
         "%s devices found after waiting %f seconds",
         len(devices),
         timeout,
     )
 
-    # Sort devices for consistent user-interface experience
-    devices.sort()
+    # Sort devices for consistent user-interface experience. Same order as
+    # `DiscoveryData.__lt__()`, but with a single key tuple built per device,
+    # rather than two for every comparison.
+    devices.sort(key=attrgetter('model', 'serial'))
 
     return devices
 
 
+def iter_discover_devices(
+    multicast_ip: str,
+    multicast_port: int,
+    timeout: float,
+    buffer_size: int | None = None,
+    interface: str | None = None,
+    loopback: bool = True,
+) -> Iterator[DiscoveryData]:
+    """
+    Generator over devices as they respond to multicast discovery.
+
+    Devices are yielded in order of arrival, for callers that want to show
+    them straight away. Stops after `timeout` seconds. See `discover_devices()`
+    for arguments.
+
+    Yields:
+        A `DiscoveryData` instance for each valid response. Invalid responses
+        are logged then skipped.
+    """
+    found = iter_udp_multicast(
+        multicast_ip,
+        multicast_port,
+        _DISCOVERY_MESSAGE,
+        timeout=timeout,
+        buffer_size=buffer_size,
+        interface=interface,
+        loopback=loopback,
+    )
+    for datagram in found:
+        try:
+            yield DiscoveryData.from_datagram(datagram)
+        except RuntimeError as e:
+            logger.error("%s", e)
+
+
 def test_device(
     address: str,
     port: int,
     duration: int,
     rate: int,
     timeout: float,
+    buffer_size: int | None = None,
 ) -> Iterator[DeviceMessage]:
     """
     Send start test command to device, then collect and parse data.
@@ -78,37 +127,149 @@ def test_device(
             Milliseconds between status report.
         timeout:
             Seconds to wait for response from server.
+        buffer_size:
+            Socket buffer size in bytes, `DEFAULT_SOCKET_BUFFER` if not given.
 
     Returns:
         Generator over test data.
     """
-    message = DeviceMessage(
-        'TEST', {
-            'CMD': 'START',
-            'DURATION': duration,
-            'RATE': rate,
-        }
-    ).to_bytes()
+    message = _test_start_bytes(duration, rate)
 
     # Parse and send back to caller as it arrives
-    for raw in udp_client(address, port, message, timeout):
+    for raw in udp_client(address, port, message, timeout, buffer_size):
         datum = DeviceMessage.from_bytes(raw)
+        finished = _check_control(datum, "device")
+        if finished is None:
+            yield datum
+        elif finished:
+            return
 
-        # Check result messages
-        if datum.name == 'TEST':
-            match datum.data:
-                case {'RESULT': 'STARTED'}:
-                    logger.info("Received 'test started' from device")
 
-                case _:
-                    pass
+def test_device_status(
+    address: str,
+    port: int,
+    duration: int,
+    rate: int,
+    timeout: float,
+    buffer_size: int | None = None,
+) -> Iterator[tuple[float, float, float]]:
+    """
+    Run test on device, producing just the status values.
+
+    As per `test_device()`, but status messages are converted straight to
+    floats, without building any intermediate objects.
 
-            # Don't send test messages back to caller
+    Returns:
+        Generator over 3-tuples of seconds since test started, milliamps,
+        and millivolts.
+    """
+    message = _test_start_bytes(duration, rate)
+    for raw in udp_client(address, port, message, timeout, buffer_size):
+        # Fast path for status data, which is almost all of the traffic
+        if raw.startswith(b"STATUS;TIME="):
+            yield StatusData.parse_scalars(raw)
             continue
 
-        # Exit when device reports that test is complete
-        if "STATE" in datum.data and datum.data["STATE"] == "IDLE":
-            logger.info("Received 'test completed' from device")
+        datum = DeviceMessage.from_bytes(raw)
+        finished = _check_control(datum, "device")
+        if finished is None:
+            status = StatusData.from_message(datum)
+            yield (status.time, status.ma, status.mv)
+        elif finished:
             return
 
-        yield datum
+
+def test_devices(
+    devices: list[DiscoveryData],
+    duration: int,
+    rate: int,
+    timeout: float,
+    buffer_size: int | None = None,
+) -> Iterator[tuple[DiscoveryData, DeviceMessage]]:
+    """
+    Run the same test on several devices at once, in a single thread.
+
+    See `test_device()`. Stops once every device has reported that its test
+    is complete, or if no device has sent anything for `timeout` seconds.
+    A device that cannot be reached is logged and left out.
+
+    Library use only for now: neither the command line nor the GUI can yet
+    select more than one device to test.
+
+    Args:
+        devices:
+            Devices to test, as found by discovery.
+        duration:
+            Seconds to run test for.
+        rate:
+            Milliseconds between status report.
+        timeout:
+            Seconds to wait for response from any device.
+        buffer_size:
+            Socket buffer size in bytes, `DEFAULT_SOCKET_BUFFER` if not given.
+
+    Returns:
+        Generator over 2-tuples of device and test data, in order of arrival.
+    """
+    message = _test_start_bytes(duration, rate)
+    servers = [(device.address, device.port) for device in devices]
+    running = set(range(len(devices)))
+    for index, raw in udp_clients(servers, message, timeout, buffer_size):
+        if index not in running:
+            continue
+        if raw is None:
+            running.discard(index)
+            if not running:
+                return
+            continue
+        device = devices[index]
+        datum = DeviceMessage.from_bytes(raw)
+        finished = _check_control(datum, device.serial)
+        if finished is None:
+            yield (device, datum)
+
+        # Finish once every device reports that its test is complete
+        elif finished:
+            running.discard(index)
+            if not running:
+                return
+
+
+def _check_control(datum: DeviceMessage, source: str) -> bool | None:
+    """
+    Check for, and log, messages from device about the test itself.
+
+    Args:
+        datum:
+            Message from device.
+        source:
+            Name of device for log messages, eg. its serial number.
+
+    Returns:
+        None if message is status data, to be passed on to the caller.
+        Otherwise whether the device reports that its test is complete.
+    """
+    if datum.name == 'TEST':
+        if datum.data.get('RESULT') == 'STARTED':
+            logger.info("Received 'test started' from %s", source)
+        return False
+
+    if datum.data.get("STATE") == "IDLE":
+        logger.info("Received 'test completed' from %s", source)
+        return True
+
+    return None
+
+
+@lru_cache(maxsize=64)
+def _test_start_bytes(duration: int, rate: int) -> bytes:
+    """
+    Build command to start test. Operators tend to reuse the same settings.
+    """
+    return DeviceMessage(
+        'TEST', {
+            'CMD': 'START',
+            'DURATION': duration,
+            'RATE': rate,
+        }
+    ).to_bytes()
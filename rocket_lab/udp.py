@@ -4,16 +4,166 @@ General purpose UDP library functions.
 
 from collections import namedtuple
 import logging
+import os
+import select
+import selectors
 import socket
+import struct
+import sys
+import time
 from typing import Iterator
 
+from . import DEFAULT_SOCKET_BUFFER
+
 
 logger = logging.getLogger(__name__)
 DEFAULT_MULTICAST_TTL = 2
+FALLBACK_SOCKET_BUFFER = 1024 * 1024
 UDP_MAX_BYTES = 65535
 
+# Create sockets in non-blocking mode directly, where supported (Linux)
+SOCK_NONBLOCK = getattr(socket, 'SOCK_NONBLOCK', 0)
+
+# Linux-only options that let root exceed `net.core.rmem_max`.
+# Not exported by the `socket` module, values from <asm-generic/socket.h>
+SO_SNDBUFFORCE = getattr(socket, 'SO_SNDBUFFORCE', 32)
+SO_RCVBUFFORCE = getattr(socket, 'SO_RCVBUFFORCE', 33)
+
+# Linux-only option to report which interface a datagram arrived on, as a
+# `struct in_pktinfo` in ancillary data. Value from <linux/in.h>
+IP_PKTINFO = getattr(socket, 'IP_PKTINFO', 8)
+IN_PKTINFO = struct.Struct("=I4s4s")
+
+# Linux-only option to report the socket's running count of datagrams dropped
+# for lack of buffer space, as a `uint32` in ancillary data. Value from
+# <asm-generic/socket.h>
+SO_RXQ_OVFL = getattr(socket, 'SO_RXQ_OVFL', 40)
+RXQ_OVFL = struct.Struct("=I")
+
+
+# Interface is the index of interface datagram arrived on, if known
+Datagram = namedtuple(
+    "Datagram", "address port data interface", defaults=[None],
+)
+
+
+def nonblocking_socket() -> socket.socket:
+    """
+    Create IPv4 UDP socket in non-blocking mode.
+
+    On Linux the socket is created that way in a single system call, rather
+    than needing a follow-up `fcntl()` call via `setblocking()`.
+
+    Returns:
+        New socket. Use `select` to wait for it to become readable.
+    """
+    sock = socket.socket(
+        socket.AF_INET,
+        socket.SOCK_DGRAM | SOCK_NONBLOCK,
+        socket.IPPROTO_UDP,
+    )
+    if not SOCK_NONBLOCK:
+        sock.setblocking(False)
+    return sock
+
+
+def check_address(address: str) -> None:
+    """
+    Ensure address is a literal IPv4 address, eg. '192.168.0.10'
+
+    Sockets happily accept hostnames too, but then block on a DNS lookup
+    before anything is sent or received.
+
+    Raises:
+        ValueError:
+            If address is not a dotted-quad IPv4 address.
+    """
+    try:
+        socket.inet_pton(socket.AF_INET, address)
+    except (OSError, TypeError):
+        raise ValueError(f"Expected IPv4 address, given {address!r}") from None
+
+
+def set_buffer_sizes(sock: socket.socket, size: int, warn: bool = True) -> int:
+    """
+    Enlarge socket's send and receive buffers.
+
+    A burst of replies from many devices can overflow the small default
+    receive buffer, causing the kernel to silently drop datagrams before we
+    get a chance to read them.
+
+    When running as root on Linux the 'force' variants of the socket options
+    are tried first, as they ignore the system-wide maximum. If the requested
+    size is refused we fall back to `FALLBACK_SOCKET_BUFFER`.
+
+    Linux silently caps the size used by normal users at the values in
+    `net.core.rmem_max` and `net.core.wmem_max`, so a message is logged if
+    the size granted is smaller than requested. Raise these limits, eg.
+
+        $ sudo sysctl -w net.core.rmem_max=7340032
+
+    Args:
+        sock:
+            Socket to configure.
+        size:
+            Requested buffer size in bytes.
+        warn:
+            Log a capped buffer as a warning, rather than for debugging.
+            Disable if the size was not asked for by the user.
+
+    Raises:
+        ValueError:
+            If size is not positive.
+
+    Returns:
+        Receive buffer size actually granted by the kernel. Note that
+        Linux doubles the requested value to allow for bookkeeping overhead.
+    """
+    if size <= 0:
+        raise ValueError(f"Buffer size must be positive, given {size}")
+
+    attempts = [
+        (socket.SO_RCVBUF, socket.SO_SNDBUF, size),
+        (socket.SO_RCVBUF, socket.SO_SNDBUF, min(size, FALLBACK_SOCKET_BUFFER)),
+    ]
+    if sys.platform == 'linux' and os.geteuid() == 0:
+        attempts.insert(0, (SO_RCVBUFFORCE, SO_SNDBUFFORCE, size))
+
+    for rcvbuf, sndbuf, requested in attempts:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, rcvbuf, requested)
+            sock.setsockopt(socket.SOL_SOCKET, sndbuf, requested)
+        except OSError as e:
+            logger.debug("Socket buffers of %s bytes refused: %s", requested, e)
+        else:
+            break
 
-Datagram = namedtuple("Datagram", "address port data")
+    # Linux reports double the size requested, if granted in full
+    granted = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    expected = size * 2 if sys.platform == 'linux' else size
+    if granted < expected:
+        logger.log(
+            logging.WARNING if warn else logging.DEBUG,
+            "Socket receive buffer limited to %s bytes (requested %s), "
+            "replies may be dropped. Try raising net.core.rmem_max",
+            granted,
+            size,
+        )
+    else:
+        logger.debug("Socket receive buffer is %s bytes", granted)
+    return granted
+
+
+def _set_buffer_sizes(sock: socket.socket, buffer_size: int | None) -> None:
+    """
+    Enlarge socket's buffers to size given, or to `DEFAULT_SOCKET_BUFFER`.
+
+    Only a size given explicitly warns if the kernel caps it.
+    """
+    if buffer_size is None:
+        set_buffer_sizes(sock, DEFAULT_SOCKET_BUFFER, warn=False)
+    else:
+        set_buffer_sizes(sock, buffer_size)
 
 
 def udp_client(
@@ -21,6 +171,7 @@ def udp_client(
     port: int,
     message: bytes,
     timeout: float,
+    buffer_size: int | None = None,
 ) -> Iterator[bytes]:
     """
     Generator over UDP server's responses to given message.
@@ -30,40 +181,143 @@ def udp_client(
             IP address of multicast group to join
         port:
             UDP port for multicast socket.
-        timeout:
         message:
             Byte string to send to multicast listeners.
+        timeout:
             Seconds to wait for response from server.
+        buffer_size:
+            Socket buffer size in bytes, `DEFAULT_SOCKET_BUFFER` if not given.
 
     Raises:
         TimeoutError:
             If nothing recieved from server for `timeout` seconds.
+        ValueError:
+            If address is not an IPv4 address, or buffer size not positive.
 
     Yields:
         Device data dataclass instances
     """
-    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+    check_address(address)
+    with nonblocking_socket() as sock:
+        _set_buffer_sizes(sock, buffer_size)
         sock.connect((address, port))
-        sock.settimeout(timeout)
         logger.debug("Connected to %s:%s", address, port)
 
         sock.send(message)
         logger.debug("Sent: %r", message)
 
+        # Check logging level, and look up methods, once rather than for
+        # every datagram
+        debug = logger.isEnabledFor(logging.DEBUG)
+        recv = sock.recv
+        wait = select.select
+        readers = [sock]
         while True:
-            data = sock.recv(UDP_MAX_BYTES)
-            logger.debug("Received: %r", data)
+            ready, _, _ = wait(readers, [], [], timeout)
+            if not ready:
+                raise TimeoutError("timed out")
+            data = recv(UDP_MAX_BYTES)
+            if debug:
+                logger.debug("Received: %r", data)
             yield data
 
 
-def udp_multicast_client(
+def udp_clients(
+    servers: list[tuple[str, int]],
+    message: bytes,
+    timeout: float,
+    buffer_size: int | None = None,
+) -> Iterator[tuple[int, bytes | None]]:
+    """
+    Generator over several UDP servers' responses to the same message.
+
+    Like `udp_client()`, but talks to all of the servers at once from a
+    single thread. One socket is opened per server, all waited on together
+    using the platform's most efficient selector (epoll on Linux).
+
+    An error receiving from one server, eg. nothing listening on its port,
+    drops just that server. The others carry on.
+
+    Args:
+        servers:
+            List of (address, port) tuples.
+        message:
+            Byte string to send to every server.
+        timeout:
+            Seconds to wait for a response from any server.
+        buffer_size:
+            Socket buffer size in bytes, `DEFAULT_SOCKET_BUFFER` if not given.
+
+    Raises:
+        TimeoutError:
+            If nothing recieved from any server for `timeout` seconds.
+        ValueError:
+            If any address is not an IPv4 address, or buffer size not
+            positive.
+
+    Yields:
+        2-tuple of index into `servers` and data received from that server.
+        Data is None, once only, when a server is dropped after an error.
+    """
+    for address, _ in servers:
+        check_address(address)
+
+    sockets = []
+    with selectors.DefaultSelector() as selector:
+        try:
+            for index, (address, port) in enumerate(servers):
+                sock = nonblocking_socket()
+                sockets.append(sock)
+                _set_buffer_sizes(sock, buffer_size)
+                sock.connect((address, port))
+                sock.send(message)
+                selector.register(sock, selectors.EVENT_READ, index)
+            logger.debug("Sent %r to %s servers", message, len(servers))
+
+            debug = logger.isEnabledFor(logging.DEBUG)
+            while selector.get_map():
+                events = selector.select(timeout)
+                if not events:
+                    raise TimeoutError("timed out")
+                for key, _ in events:
+                    while True:
+                        try:
+                            data = key.fileobj.recv(UDP_MAX_BYTES)
+                        except BlockingIOError:
+                            break
+                        except OSError as e:
+                            address, port = servers[key.data]
+                            logger.error(
+                                "Dropping %s:%s after error: %s",
+                                address,
+                                port,
+                                e,
+                            )
+                            selector.unregister(key.fileobj)
+                            yield (key.data, None)
+                            break
+                        if debug:
+                            logger.debug("Received: %r", data)
+                        yield (key.data, data)
+        finally:
+            for sock in sockets:
+                sock.close()
+
+
+def iter_udp_multicast(
     address: str,
     port: int,
     message: bytes,
     timeout: float,
-) -> list[Datagram]:
+    buffer_size: int | None = None,
+    interface: str | None = None,
+    loopback: bool = True,
+) -> Iterator[Datagram]:
     """
-    Send message to multicast group's subscribers.
+    Generator over responses to message sent to multicast group's subscribers.
+
+    Responses are yielded as soon as they arrive, rather than only after
+    the whole `timeout` has passed.
 
     Args:
         address:
@@ -73,33 +327,140 @@ def udp_multicast_client(
         message:
             Byte string to send to multicast listeners.
         timeout:
-            Seconds to wait for discovery messages to come back
+            Total seconds to wait for discovery messages to come back.
+        buffer_size:
+            Socket buffer size in bytes, `DEFAULT_SOCKET_BUFFER` if not given.
+        interface:
+            IP address of local interface to send from, eg. "192.168.0.2"
+            Let the kernel choose via routing table if not given.
+        loopback:
+            Deliver message to listeners on this host too. Disable if no
+            devices are running locally.
 
-    Returns:
-        List of datagram tuples containing responses and sender's details.
+    Raises:
+        ValueError:
+            If address or interface is not an IPv4 address, or buffer size
+            not positive.
+
+    Yields:
+        Datagram tuples containing responses and sender's details. On Linux
+        these include the index of the interface each arrived on.
     """
-    logging.info("Send multicast UDP discovery message to find devices")
-    with socket.socket(
-        socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP
-    ) as sock:
+    check_address(address)
+    if interface is not None:
+        check_address(interface)
+    logger.info("Send multicast UDP discovery message to find devices")
+    with nonblocking_socket() as sock:
+        _set_buffer_sizes(sock, buffer_size)
         sock.setsockopt(
             socket.IPPROTO_IP,
             socket.IP_MULTICAST_TTL,
             DEFAULT_MULTICAST_TTL,
         )
-        sock.settimeout(timeout)
+        sock.setsockopt(
+            socket.IPPROTO_IP,
+            socket.IP_MULTICAST_LOOP,
+            int(loopback),
+        )
+        if interface is not None:
+            sock.setsockopt(
+                socket.IPPROTO_IP,
+                socket.IP_MULTICAST_IF,
+                socket.inet_aton(interface),
+            )
+        ancillary_size = 0
+        if sys.platform == 'linux':
+            sock.setsockopt(socket.IPPROTO_IP, IP_PKTINFO, 1)
+            sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+            ancillary_size = (
+                socket.CMSG_SPACE(IN_PKTINFO.size) +
+                socket.CMSG_SPACE(RXQ_OVFL.size)
+            )
+        # Imported here as loading `ctypes` and libc adds about a fifth to
+        # the package's import time, and only discovery needs it
+        from . import _recvmmsg
+        receiver = None
+        if _recvmmsg.AVAILABLE:
+            receiver = _recvmmsg.BatchReceiver(ancillary_size=ancillary_size)
 
         sock.sendto(message, (address, port))
-        logging.debug("Sent %r to %r:%r", message, address, port)
+        logger.debug("Sent %r to %r:%r", message, address, port)
+
+        # Collect multicast responses until `timeout` seconds have passed,
+        # draining everything already queued by the kernel on each wakeup.
+        # Where available, `recvmmsg()` reads a whole batch per system call.
+        debug = logger.isEnabledFor(logging.DEBUG)
+        dropped = 0
+        deadline = time.monotonic() + timeout
+        while (remaining := deadline - time.monotonic()) > 0:
+            ready, _, _ = select.select([sock], [], [], remaining)
+            if not ready:
+                break
+
+            if receiver is not None:
+                received = receiver.receive(sock)
+            else:
+                received = _receive_queued(sock, ancillary_size)
+            for data, ancillary, address in received:
+                if debug:
+                    logger.debug("Got  %r from %r", data, address)
+                count = _dropped_count(ancillary)
+                if count is not None and count > dropped:
+                    logger.warning(
+                        "Kernel dropped %s discovery replies, "
+                        "socket receive buffer may be too small",
+                        count - dropped,
+                    )
+                    dropped = count
+                interface_index = _interface_index(ancillary)
+                yield Datagram(*address, data, interface_index)
 
-        # Block for `timeout` seconds to collect multicast responses
-        datagrams = []
+
+def _receive_queued(
+    sock: socket.socket,
+    ancillary_size: int,
+) -> list[tuple[bytes, list[tuple[int, int, bytes]], tuple[str, int]]]:
+    """
+    Read every datagram already queued on socket, one system call each.
+
+    Fallback for platforms without `recvmmsg()`.
+    """
+    received = []
+    while True:
         try:
-            while True:
+            if ancillary_size:
+                data, ancillary, _, address = sock.recvmsg(
+                    UDP_MAX_BYTES, ancillary_size,
+                )
+            else:
                 data, address = sock.recvfrom(UDP_MAX_BYTES)
-                logging.debug("Got  %r from %r", data, address)
-                datagrams.append(Datagram(*address, data))
-        except TimeoutError:
-            pass
+                ancillary = []
+        except BlockingIOError:
+            break
+        received.append((data, ancillary, address))
+    return received
+
+
+def _interface_index(ancillary: list[tuple[int, int, bytes]]) -> int | None:
+    """
+    Extract index of receiving interface from `IP_PKTINFO` ancillary data.
+    """
+    for level, kind, payload in ancillary:
+        if level == socket.IPPROTO_IP and kind == IP_PKTINFO:
+            index, _, _ = IN_PKTINFO.unpack_from(payload)
+            return index
+    return None
+
 
-        return datagrams
+def _dropped_count(ancillary: list[tuple[int, int, bytes]]) -> int | None:
+    """
+    Extract socket's running total of dropped datagrams from ancillary data.
+
+    The kernel only attaches `SO_RXQ_OVFL` data once something has been
+    dropped, so None means no drops were reported.
+    """
+    for level, kind, payload in ancillary:
+        if level == socket.SOL_SOCKET and kind == SO_RXQ_OVFL:
+            count, = RXQ_OVFL.unpack_from(payload)
+            return count
+    return None
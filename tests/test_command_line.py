@@ -1,8 +1,12 @@
 
 from argparse import ArgumentTypeError
+from contextlib import redirect_stderr
+import io
 from unittest import TestCase
 
-from rocket_lab.command_line import argparse_address_tuple
+from rocket_lab.command_line import (
+    argparse_address_tuple, argparse_buffer_size, parse,
+)
 
 
 class ArgparseAddressTupleTest(TestCase):
@@ -14,10 +18,15 @@ class ArgparseAddressTupleTest(TestCase):
         self.assertEqual(address, "127.0.0.0")
         self.assertEqual(port, 6060)
 
-    def test_loopback_ipv6(self) -> None:
-        address, port = argparse_address_tuple("::1:6060")
-        self.assertEqual(address, "::1")
-        self.assertEqual(port, 6060)
+    def test_error_ipv6(self) -> None:
+        message = r"^Expected IPv4 address, given '::1'$"
+        with self.assertRaisesRegex(ArgumentTypeError, message):
+            argparse_address_tuple("::1:6060")
+
+    def test_error_hostname(self) -> None:
+        message = r"^Expected IPv4 address, given 'localhost'$"
+        with self.assertRaisesRegex(ArgumentTypeError, message):
+            argparse_address_tuple("localhost:6061")
 
     def test_error_port_missing(self) -> None:
         message = r"^Port number missing. Use colon to separate.$"
@@ -28,3 +37,55 @@ class ArgparseAddressTupleTest(TestCase):
         message = r"^Invalid port number. Expected integer, given 'banana'$"
         with self.assertRaisesRegex(ArgumentTypeError, message):
             argparse_address_tuple("192.168.0.10:banana")
+
+
+class ArgparseBufferSizeTest(TestCase):
+    def test_buffer_size(self) -> None:
+        self.assertEqual(argparse_buffer_size("7340032"), 7340032)
+
+    def test_error_not_integer(self) -> None:
+        message = r"^Invalid buffer size. Expected integer, given 'big'$"
+        with self.assertRaisesRegex(ArgumentTypeError, message):
+            argparse_buffer_size("big")
+
+    def test_error_not_positive(self) -> None:
+        message = r"^Invalid buffer size. Expected positive integer, given "
+        for string in ("0", "-5"):
+            with self.subTest(string=string):
+                with self.assertRaisesRegex(ArgumentTypeError, message):
+                    argparse_buffer_size(string)
+
+
+class ParseTest(TestCase):
+    def test_default(self) -> None:
+        options = parse([])
+        self.assertIsNone(options.command)
+        self.assertEqual(options.timeout, 1.0)
+
+    def test_device_test(self) -> None:
+        options = parse(['--timeout=0.5', 'test', '-d', '5', '127.0.0.1:6062'])
+        self.assertEqual(options.command, 'test')
+        self.assertEqual(options.address, ('127.0.0.1', 6062))
+        self.assertEqual(options.duration, 5)
+        self.assertEqual(options.timeout, 0.5)
+
+    def test_error_hostname(self) -> None:
+        """
+        Hostnames are a usage error, for every address argument.
+        """
+        for arguments in (
+            ['test', 'localhost:6061'],
+            ['--multicast', 'foo:31115', 'discover'],
+            ['--interface', 'eth0', 'discover'],
+        ):
+            stderr = io.StringIO()
+            with self.subTest(arguments=arguments):
+                with redirect_stderr(stderr), self.assertRaises(SystemExit):
+                    parse(arguments)
+                self.assertIn("Expected IPv4 address", stderr.getvalue())
+
+    def test_error_socket_buffer(self) -> None:
+        stderr = io.StringIO()
+        with redirect_stderr(stderr), self.assertRaises(SystemExit):
+            parse(['--socket-buffer', '-5', 'discover'])
+        self.assertIn("Expected positive integer", stderr.getvalue())
@@ -1,7 +1,14 @@
 
+import math
 from unittest import skip, TestCase
 
-from rocket_lab.data import Datagram, DeviceMessage, DiscoveryData, StatusData
+from rocket_lab.data import (
+    Datagram,
+    DeviceMessage,
+    DiscoveryData,
+    RunningAggregates,
+    StatusData,
+)
 
 
 class DeviceMessageTest(TestCase):
@@ -24,6 +31,56 @@ class DeviceMessageTest(TestCase):
         with self.assertRaisesRegex(ValueError, message):
             DeviceMessage.from_bytes(b"ID;MODEL=M001=M002;SERIAL=SN0123456;")
 
+    def test_invalid_no_equals(self) -> None:
+        message = r"^Could not parse MODEL from b'ID;MODEL;SERIAL=SN0123456;'$"
+        with self.assertRaisesRegex(ValueError, message):
+            DeviceMessage.from_bytes(b"ID;MODEL;SERIAL=SN0123456;")
+
+    def test_empty_name(self) -> None:
+        message = r"^Empty message$"
+        with self.assertRaisesRegex(ValueError, message):
+            DeviceMessage.from_bytes(b";MODEL=M001;")
+
+    def test_no_trailing_semicolon(self) -> None:
+        data = DeviceMessage.from_bytes(b"STATUS;TIME=100;MV=3332")
+        expected = DeviceMessage(
+            name='STATUS',
+            data={'TIME': '100', 'MV': '3332'},
+        )
+        self.assertEqual(data, expected)
+
+    def test_empty_parts_and_values(self) -> None:
+        data = DeviceMessage.from_bytes(b"TEST;;RESULT=;;")
+        expected = DeviceMessage(
+            name='TEST',
+            data={'RESULT': ''},
+        )
+        self.assertEqual(data, expected)
+
+    def test_status_not_fast_path(self) -> None:
+        """
+        Status messages with unexpected fields still parsed in full.
+        """
+        data = DeviceMessage.from_bytes(b"STATUS;TIME=100;MV=3332;MA=45;X=1;")
+        expected = DeviceMessage(
+            name='STATUS',
+            data={'TIME': '100', 'MV': '3332', 'MA': '45', 'X': '1'},
+        )
+        self.assertEqual(data, expected)
+
+    def test_status_error(self) -> None:
+        message = r"^Could not parse MV=3=3 from "
+        with self.assertRaisesRegex(ValueError, message):
+            DeviceMessage.from_bytes(b"STATUS;TIME=100;MV=3=3;MA=45;")
+
+    def test_latin1(self) -> None:
+        data = DeviceMessage.from_bytes(b"ID;MODEL=M\xb5;")
+        expected = DeviceMessage(
+            name='ID',
+            data={'MODEL': 'M\xb5'},
+        )
+        self.assertEqual(data, expected)
+
     def test_to_string(self) -> None:
         """
         Serialise data into unicode string.
@@ -267,6 +324,31 @@ class DiscoveryDataTest(TestCase):
         ]
         self.assertEqual(devices, expected)
 
+    def test_from_datagram_reordered(self) -> None:
+        datagram = Datagram(
+            '192.168.0.10', 6062, b"ID;SERIAL=SN0123456;MODEL=M001;",
+        )
+        device = DiscoveryData.from_datagram(datagram)
+        self.assertEqual(device.model, 'M001')
+        self.assertEqual(device.serial, 'SN0123456')
+
+    def test_from_datagram_error(self) -> None:
+        datagram = Datagram('192.168.0.10', 6062, b"ID;MODEL=M001;")
+        message = r"^Device data missing: 'SERIAL' not found$"
+        with self.assertRaisesRegex(RuntimeError, message):
+            DiscoveryData.from_datagram(datagram)
+
+    def test_from_datagram_malformed(self) -> None:
+        datagram = Datagram('192.168.0.10', 6062, b"ID;MODEL=A=B;")
+        message = r"^Device data error: Could not parse MODEL=A=B from "
+        with self.assertRaisesRegex(RuntimeError, message):
+            DiscoveryData.from_datagram(datagram)
+
+    def test_model_interned(self) -> None:
+        datagrams = [DEVICE_DISCOVERY, DEVICE_DISCOVERY2]
+        first, second = DiscoveryData.from_datagrams(datagrams)
+        self.assertIs(first.model, second.model)
+
     def test_hashable(self) -> None:
         """
         Confirm that we can use frozen dataclasses as the key in a dictionary.
@@ -339,6 +421,35 @@ class DiscoveryDataTest(TestCase):
         devices.sort()
         self.assertEqual(devices, expected)
 
+    def test_comparisons(self) -> None:
+        first = DiscoveryData(
+            address='192.168.0.10', port=6062,
+            model='M001', serial='SN0123456')
+        second = DiscoveryData(
+            address='192.168.0.10', port=6063,
+            model='M001', serial='SN0123457')
+        self.assertTrue(first < second)
+        self.assertTrue(first <= second)
+        self.assertTrue(first <= first)
+        self.assertTrue(second > first)
+        self.assertTrue(second >= first)
+        self.assertFalse(first > second)
+        self.assertFalse(first < first)
+
+    def test_same_device_different_port(self) -> None:
+        """
+        Neither is before the other, but they are not equal.
+        """
+        first = DiscoveryData(
+            address='192.168.0.10', port=6062,
+            model='M001', serial='SN0123456')
+        second = DiscoveryData(
+            address='192.168.0.10', port=6063,
+            model='M001', serial='SN0123456')
+        self.assertFalse(first < second)
+        self.assertFalse(second < first)
+        self.assertNotEqual(first, second)
+
 
 class StatusDataTest(TestCase):
     def test_from_message(self) -> None:
@@ -352,6 +463,27 @@ class StatusDataTest(TestCase):
         expected = StatusData(ma=-11.1, mv=4448.9, time=0.3)
         self.assertEqual(data, expected)
 
+    def test_parse_scalars(self) -> None:
+        scalars = StatusData.parse_scalars(b"STATUS;TIME=300;MV=4448.9;MA=-11.1;")
+        self.assertEqual(scalars, (0.3, -11.1, 4448.9))
+
+    def test_parse_scalars_reordered(self) -> None:
+        scalars = StatusData.parse_scalars(b"STATUS;MA=-11.1;TIME=300;MV=4448.9;")
+        self.assertEqual(scalars, (0.3, -11.1, 4448.9))
+
+    def test_parse_scalars_error_data_bad(self) -> None:
+        error = (
+            r"^Invalid status data: could not "
+            r"convert string to float: b?'banana'$"
+        )
+        with self.assertRaisesRegex(ValueError, error):
+            StatusData.parse_scalars(b"STATUS;TIME=300;MV=banana;MA=-11.1;")
+
+    def test_parse_scalars_error_data_missing(self) -> None:
+        error = r"^Status data missing: 'MV' not found$"
+        with self.assertRaisesRegex(ValueError, error):
+            StatusData.parse_scalars(b"STATUS;TIME=300;MA=-11.1;")
+
     def test_error_data_missing(self) -> None:
         # No millivolts?!
         message = DeviceMessage(
@@ -384,3 +516,20 @@ class StatusDataTest(TestCase):
         error = r"^Expected a message of type 'STATUS', got 'ID'"
         with self.assertRaisesRegex(ValueError, error):
             StatusData.from_message(message)
+
+
+class RunningAggregatesTest(TestCase):
+    def test_aggregates(self) -> None:
+        aggregates = RunningAggregates()
+        for value in (50.6, 13.6, -11.1, -23.4, 100.1):
+            aggregates.add(value)
+        self.assertEqual(aggregates.count, 5)
+        self.assertAlmostEqual(aggregates.mean, 25.96)
+        self.assertEqual(aggregates.maximum, 100.1)
+        self.assertEqual(aggregates.minimum, -23.4)
+
+    def test_empty(self) -> None:
+        aggregates = RunningAggregates()
+        self.assertEqual(aggregates.count, 0)
+        self.assertTrue(math.isnan(aggregates.mean))
+
@@ -0,0 +1,45 @@
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from rocket_lab import device_cache
+from rocket_lab.data import DiscoveryData
+
+
+DEVICES = [
+    DiscoveryData(
+        address='192.168.0.10', port=6062,
+        model='M001', serial='SN0123456'),
+    DiscoveryData(
+        address='192.168.0.10', port=6063,
+        model='M001', serial='SN0123457'),
+]
+
+
+class DeviceCacheTest(TestCase):
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.path = Path(self.folder.name) / 'rocket_lab' / 'devices.json'
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_round_trip(self) -> None:
+        device_cache.save(DEVICES, path=self.path)
+        devices = device_cache.load(self.path)
+        self.assertEqual(devices, DEVICES)
+
+    def test_expired(self) -> None:
+        device_cache.save(DEVICES, ttl=-1, path=self.path)
+        self.assertEqual(device_cache.load(self.path), [])
+
+    def test_missing(self) -> None:
+        self.assertEqual(device_cache.load(self.path), [])
+
+    def test_invalid(self) -> None:
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text("banana")
+        with self.assertLogs('rocket_lab.device_cache', level='WARNING'):
+            devices = device_cache.load(self.path)
+        self.assertEqual(devices, [])
@@ -0,0 +1,112 @@
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from rocket_lab.data import DeviceMessage, DiscoveryData
+from rocket_lab import networking
+from rocket_lab.udp import Datagram
+
+from .test_udp import closed_port, ReplyServer
+
+
+# Replies to start command for a one second test, at a rate of 500ms
+TEST_REPLIES = [
+    b"TEST;RESULT=STARTED;",
+    b"STATUS;TIME=500;MV=3332;MA=45;",
+    b"STATUS;TIME=1000;MV=3330;MA=46;",
+    b"STATUS;STATE=IDLE;",
+]
+
+
+class IterDiscoverDevicesTest(TestCase):
+    @patch('rocket_lab.networking.iter_udp_multicast')
+    def test_invalid_reply_skipped(self, iter_udp_multicast) -> None:
+        """
+        A malformed reply must not stop discovery of devices replying later.
+        """
+        iter_udp_multicast.return_value = iter([
+            Datagram('192.168.0.11', 6062, b"ID;MODEL=A=B;"),
+            Datagram('192.168.0.10', 6062, b"ID;MODEL=M001;SERIAL=SN0123456;"),
+        ])
+        with self.assertLogs('rocket_lab.networking', 'ERROR'):
+            devices = list(networking.iter_discover_devices(
+                "224.3.11.15", 31115, timeout=0.1,
+            ))
+        expected = [
+            DiscoveryData(
+                address='192.168.0.10', port=6062,
+                model='M001', serial='SN0123456'),
+        ]
+        self.assertEqual(devices, expected)
+
+
+@patch('rocket_lab.networking.udp_client')
+class TestDeviceTest(TestCase):
+    """
+    Status data passed through, control messages consumed.
+    """
+    def test_device(self, udp_client) -> None:
+        udp_client.return_value = iter(TEST_REPLIES)
+        results = list(networking.test_device("127.0.0.1", 6062, 1, 500, 1.0))
+        expected = [DeviceMessage.from_bytes(raw) for raw in TEST_REPLIES[1:3]]
+        self.assertEqual(results, expected)
+
+    def test_device_status(self, udp_client) -> None:
+        udp_client.return_value = iter(TEST_REPLIES)
+        runner = networking.test_device_status("127.0.0.1", 6062, 1, 500, 1.0)
+        with self.assertLogs('rocket_lab.networking', 'INFO') as logs:
+            results = list(runner)
+        self.assertEqual(results, [(0.5, 45.0, 3332.0), (1.0, 46.0, 3330.0)])
+        self.assertEqual(len(logs.output), 2)
+
+    def test_device_status_reordered(self, udp_client) -> None:
+        """
+        Status data not in the usual order takes the general-purpose route.
+        """
+        udp_client.return_value = iter([
+            b"STATUS;MA=45;MV=3332;TIME=500;",
+            b"STATUS;STATE=IDLE;",
+            b"STATUS;TIME=1000;MV=3330;MA=46;",
+        ])
+        runner = networking.test_device_status("127.0.0.1", 6062, 1, 500, 1.0)
+        self.assertEqual(list(runner), [(0.5, 45.0, 3332.0)])
+
+
+class TestDevicesTest(TestCase):
+    def device(self, address: tuple[str, int], serial: str) -> DiscoveryData:
+        return DiscoveryData(*address, model='M001', serial=serial)
+
+    def test_devices(self) -> None:
+        first = ReplyServer(TEST_REPLIES)
+        second = ReplyServer(TEST_REPLIES)
+        devices = [
+            self.device(first.address, 'SN0123456'),
+            self.device(second.address, 'SN0123457'),
+        ]
+        results = list(networking.test_devices(devices, 1, 500, 1.0))
+
+        # Only status data, and every device gets the same command
+        self.assertEqual(len(results), 4)
+        for device in devices:
+            messages = [m for d, m in results if d == device]
+            self.assertEqual(
+                messages,
+                [DeviceMessage.from_bytes(raw) for raw in TEST_REPLIES[1:3]],
+            )
+        self.assertEqual(first.received, second.received)
+        self.assertEqual(
+            first.received, b"TEST;CMD=START;DURATION=1;RATE=500;",
+        )
+
+    def test_unreachable_device(self) -> None:
+        """
+        Other devices are still tested if one cannot be reached.
+        """
+        server = ReplyServer(TEST_REPLIES)
+        devices = [
+            self.device(closed_port(), 'SN0123456'),
+            self.device(server.address, 'SN0123457'),
+        ]
+        with self.assertLogs('rocket_lab.udp', 'ERROR'):
+            results = list(networking.test_devices(devices, 1, 500, 1.0))
+        self.assertEqual([d for d, _ in results], [devices[1]] * 2)
@@ -0,0 +1,182 @@
+
+import socket
+import sys
+from threading import Thread
+from unittest import skipUnless, TestCase
+from unittest.mock import Mock
+
+from rocket_lab import _recvmmsg
+from rocket_lab.udp import (
+    _dropped_count, _interface_index, check_address, IN_PKTINFO, IP_PKTINFO,
+    nonblocking_socket, RXQ_OVFL, SO_RXQ_OVFL, set_buffer_sizes, udp_client,
+    udp_clients, UDP_MAX_BYTES,
+)
+
+
+class ReplyServer(Thread):
+    """
+    Local UDP server that answers the first datagram with canned replies.
+    """
+    def __init__(self, replies: list[bytes]):
+        super().__init__(daemon=True)
+        self.replies = replies
+        self.received = None
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(5)
+        self.sock.bind(("127.0.0.1", 0))
+        self.address = self.sock.getsockname()
+        self.start()
+
+    def run(self) -> None:
+        with self.sock:
+            self.received, client = self.sock.recvfrom(UDP_MAX_BYTES)
+            for reply in self.replies:
+                self.sock.sendto(reply, client)
+
+
+def closed_port() -> tuple[str, int]:
+    """
+    Local address with nothing listening on it.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()
+
+
+class CheckAddressTest(TestCase):
+    def test_ipv4(self) -> None:
+        check_address("192.168.0.10")
+
+    def test_error_hostname(self) -> None:
+        message = r"^Expected IPv4 address, given 'localhost'$"
+        with self.assertRaisesRegex(ValueError, message):
+            check_address("localhost")
+
+    def test_error_shorthand(self) -> None:
+        with self.assertRaises(ValueError):
+            check_address("127.1")
+
+    def test_udp_client(self) -> None:
+        """
+        No socket created, nor DNS lookup attempted, for hostnames.
+        """
+        with self.assertRaises(ValueError):
+            next(udp_client("example.com", 6062, b"ID;", timeout=0.1))
+
+
+class DroppedCountTest(TestCase):
+    def test_dropped(self) -> None:
+        ancillary = [
+            (socket.IPPROTO_IP, IP_PKTINFO, bytes(12)),
+            (socket.SOL_SOCKET, SO_RXQ_OVFL, RXQ_OVFL.pack(198)),
+        ]
+        self.assertEqual(_dropped_count(ancillary), 198)
+
+    def test_none_dropped(self) -> None:
+        ancillary = [(socket.IPPROTO_IP, IP_PKTINFO, bytes(12))]
+        self.assertIsNone(_dropped_count(ancillary))
+
+
+class SetBufferSizesTest(TestCase):
+    def capped_socket(self, granted: int) -> Mock:
+        """
+        Socket that accepts any size, but reports `granted` bytes.
+        """
+        sock = Mock(spec=socket.socket)
+        sock.getsockopt.return_value = granted
+        return sock
+
+    @skipUnless(sys.platform == 'linux', "Linux doubles buffer sizes")
+    def test_granted_in_full(self) -> None:
+        sock = self.capped_socket(2 * 65536)
+        with self.assertNoLogs('rocket_lab.udp', 'WARNING'):
+            self.assertEqual(set_buffer_sizes(sock, 65536), 2 * 65536)
+
+    @skipUnless(sys.platform == 'linux', "Linux doubles buffer sizes")
+    def test_capped_below_double(self) -> None:
+        """
+        Granted more than requested, but less than double, is still capped.
+        """
+        sock = self.capped_socket(100_000)
+        with self.assertLogs('rocket_lab.udp', 'WARNING'):
+            set_buffer_sizes(sock, 65536)
+
+    def test_error_not_positive(self) -> None:
+        sock = self.capped_socket(4096)
+        message = r"^Buffer size must be positive, given -5$"
+        with self.assertRaisesRegex(ValueError, message):
+            set_buffer_sizes(sock, -5)
+        sock.setsockopt.assert_not_called()
+
+    def test_capped_no_warning(self) -> None:
+        sock = self.capped_socket(4096)
+        with self.assertNoLogs('rocket_lab.udp', 'WARNING'):
+            set_buffer_sizes(sock, 65536, warn=False)
+
+
+@skipUnless(_recvmmsg.AVAILABLE, "recvmmsg() not available")
+class BatchReceiverTest(TestCase):
+    def setUp(self) -> None:
+        self.server = nonblocking_socket()
+        self.server.setsockopt(socket.IPPROTO_IP, IP_PKTINFO, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.client.bind(("127.0.0.1", 0))
+
+    def tearDown(self) -> None:
+        self.server.close()
+        self.client.close()
+
+    def test_receive(self) -> None:
+        """
+        Read more datagrams than fit in a single batch, with their details.
+        """
+        count = _recvmmsg.BATCH_SIZE + 8
+        messages = [f"MESSAGE;INDEX={i};".encode() for i in range(count)]
+        for message in messages:
+            self.client.sendto(message, self.server.getsockname())
+
+        ancillary_size = socket.CMSG_SPACE(IN_PKTINFO.size)
+        receiver = _recvmmsg.BatchReceiver(ancillary_size=ancillary_size)
+        received = receiver.receive(self.server)
+
+        self.assertEqual(len(received), count)
+        self.assertEqual([data for data, _, _ in received], messages)
+        sender = self.client.getsockname()
+        for _, ancillary, address in received:
+            self.assertEqual(address, sender)
+            self.assertEqual(
+                _interface_index(ancillary), socket.if_nametoindex('lo'),
+            )
+
+    def test_receive_empty(self) -> None:
+        receiver = _recvmmsg.BatchReceiver()
+        self.assertEqual(receiver.receive(self.server), [])
+
+
+class UdpClientsTest(TestCase):
+    def collect(self, servers: list[tuple[str, int]]) -> dict[int, list]:
+        received = {index: [] for index in range(len(servers))}
+        try:
+            for index, data in udp_clients(servers, b"HELLO;", timeout=0.5):
+                received[index].append(data)
+        except TimeoutError:
+            pass
+        return received
+
+    def test_several_servers(self) -> None:
+        first = ReplyServer([b"A1", b"A2"])
+        second = ReplyServer([b"B1"])
+        received = self.collect([first.address, second.address])
+        self.assertEqual(received, {0: [b"A1", b"A2"], 1: [b"B1"]})
+        self.assertEqual(first.received, b"HELLO;")
+        self.assertEqual(second.received, b"HELLO;")
+
+    def test_unreachable_server_dropped(self) -> None:
+        """
+        Error from one server leaves the others running.
+        """
+        server = ReplyServer([b"A1", b"A2"])
+        with self.assertLogs('rocket_lab.udp', 'ERROR'):
+            received = self.collect([closed_port(), server.address])
+        self.assertEqual(received, {0: [None], 1: [b"A1", b"A2"]})